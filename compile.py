@@ -4,6 +4,7 @@ PREREQUISITES:
 git is installed
 pip install pathspec
 for certain optimizations, ffmpeg must be installed
+optionally, pip install isal and pass --fast-deflate for faster (but larger) deflate
 This command has ran:
     npm i love.js
 
@@ -11,37 +12,172 @@ No other python packages necessrary
 Works on Python 3.9 and later
 """
 
-from collections.abc import Sequence
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
-import io
+import functools
+from html import escape
+import json
 import os
+import re
 import subprocess
+import tempfile
 import zipfile
+import zlib
 from pathlib import Path
-from typing import List, Optional, Union
-from bs4 import BeautifulSoup, Tag
-import pathspec
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+from pathspec.patterns import GitWildMatchPattern
 import shutil
 import platform
-import time
 
-def load_gitignore_patterns(root: Path) -> pathspec.PathSpec:
-    patterns: List[str] = []
+# (source path, -q:a level, ffmpeg input format)
+TranscodeJob = Tuple[str, Optional[int], str]
 
-    for gitignore in root.rglob(".gitignore"):
-        rel_dir = gitignore.parent.relative_to(root)
+# most audio files handed to a single ffmpeg invocation
+TRANSCODE_BATCH_SIZE = 64
 
-        with gitignore.open("r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue  # Skip empty lines and comments
+# CreateProcess' command line limit, minus the terminating NUL. POSIX ARG_MAX is far larger,
+# so keeping every ffmpeg command line under it is safe everywhere
+MAX_COMMAND_LINE = 32767 - 1
 
-                # Prepend relative directory to scope the pattern correctly
-                scoped_pattern = str(rel_dir / line) if rel_dir != Path(".") else line
-                patterns.append(scoped_pattern)
+try:
+    # ISA-L's SIMD deflate, only used with --fast-deflate. Even at its best level (3) it
+    # compresses worse than zlib's default level 6: about 24% more output on Lua sources
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
 
-    return pathspec.PathSpec.from_lines("gitwildmatch", patterns)
+# payloads that are already compressed; running deflate over them only burns CPU
+INCOMPRESSIBLE = frozenset({".ogg", ".mp3", ".png", ".jpg", ".jpeg", ".webp", ".woff", ".woff2"})
+
+# chunk size when streaming stored files into the zip
+COPY_BUFFER_SIZE = 1 << 20
+
+# targeted edits to love.js' index.html, which is small and has a fixed layout
+HEAD_OPEN_RE = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+H1_FOOTER_RE = re.compile(r"<(h1|footer)\b[^>]*>.*?</\1>", re.DOTALL | re.IGNORECASE)
+
+# parsed .gitignore lines from previous runs, keyed by path and checked against (mtime, size)
+IGNORE_CACHE_FILE = Path.home() / ".cache" / "kristal-wasm-compiler" / "ignore.json"
+
+
+def is_ignore_cache_entry(entry: object) -> bool:
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("mtime_ns"), int)
+        and isinstance(entry.get("size"), int)
+        and isinstance(entry.get("lines"), list)
+        and all(isinstance(line, str) for line in entry["lines"])
+    )
+
+
+def load_ignore_cache() -> Dict[str, dict]:
+    try:
+        cache = json.loads(IGNORE_CACHE_FILE.read_text(encoding="UTF-8"))
+    except (OSError, ValueError):
+        return {}
+    # well-formed JSON of some other shape is treated like an unreadable file
+    if not isinstance(cache, dict) or not all(is_ignore_cache_entry(entry) for entry in cache.values()):
+        return {}
+    return cache
+
+
+def save_ignore_cache(cache: Dict[str, dict]) -> None:
+    try:
+        IGNORE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        IGNORE_CACHE_FILE.write_text(json.dumps(cache), encoding="UTF-8")
+    except OSError:
+        pass  # the cache is only an optimization
+
+
+@functools.lru_cache(maxsize=None)
+def read_gitignore(gitignore_path: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    """
+    Returns the non-empty, non-comment lines of a .gitignore.
+    mtime_ns and size are unused other than to invalidate the cache when the file changes
+    """
+    lines: List[str] = []
+    with open(gitignore_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue  # Skip empty lines and comments
+            lines.append(line)
+    return tuple(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_gitignore(lines: Tuple[str, ...]) -> Tuple[Tuple["re.Pattern[str]", bool], ...]:
+    """
+    Compiles .gitignore lines to (regex, include) pairs, where include is False for ! patterns.
+    pathspec is only used to translate gitwildmatch syntax into regexes
+    """
+    compiled = []
+    for line in lines:
+        pattern = GitWildMatchPattern(line)
+        if pattern.include is not None:
+            compiled.append((pattern.regex, pattern.include))
+    return tuple(compiled)
+
+
+class IgnoreRules:
+    """
+    Every .gitignore's patterns, bucketed under the posix prefix of the directory it was found in
+    ("" for the root, "mods/" for mods/.gitignore, ...). Each bucket's patterns are matched
+    relative to that directory, and a path only gets tested against the buckets of its own
+    ancestors instead of every pattern in the repository
+    """
+
+    def __init__(self, root: str) -> None:
+        self.buckets: Dict[str, Tuple[Tuple["re.Pattern[str]", bool], ...]] = {}
+        self.root = root
+        self.cache = load_ignore_cache()
+        self.cache_dirty = False
+        self.seen: Set[str] = set()
+
+    def add_gitignore(self, rel_prefix: str, gitignore: "os.DirEntry[str]") -> None:
+        key = gitignore.path
+        self.seen.add(key)
+        st = gitignore.stat()
+        cached = self.cache.get(key)
+        if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            lines = tuple(cached["lines"])
+        else:
+            lines = read_gitignore(key, st.st_mtime_ns, st.st_size)
+            self.cache[key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "lines": list(lines)}
+            self.cache_dirty = True
+        bucket = compile_gitignore(lines)
+        if bucket:
+            self.buckets[rel_prefix] = bucket
+
+    def match_file(self, rel_str: str) -> bool:
+        """
+        rel_str is posix and relative to the root; directories end with a slash.
+        Deeper .gitignores are checked after shallower ones, and the last matching pattern wins
+        """
+        ignored = False
+        start = 0
+        while True:
+            bucket = self.buckets.get(rel_str[:start])
+            if bucket:
+                sub_path = rel_str[start:]
+                for regex, include in bucket:
+                    if regex.match(sub_path) is not None:
+                        ignored = include
+            start = rel_str.find("/", start) + 1
+            # stop past the last part; a directory's own .gitignore doesn't apply to itself
+            if start == 0 or start == len(rel_str):
+                return ignored
+
+    def save(self) -> None:
+        # forget .gitignores under this root that weren't found this run (deleted, or now inside
+        # an ignored directory) so the cache only ever holds what the last build of each root saw
+        root_prefix = os.path.join(self.root, "")
+        stale = [key for key in self.cache if key.startswith(root_prefix) and key not in self.seen]
+        for key in stale:
+            del self.cache[key]
+        if self.cache_dirty or stale:
+            save_ignore_cache(self.cache)
 
 
 @dataclass
@@ -73,6 +209,8 @@ class ZipOptions:
     remove_builtin_libs: bool = True
     also_compress_converted_ogg: bool = True
     memory: Optional[int] = None
+    # deflate with isal instead of zlib (faster, larger .love)
+    fast_deflate: bool = False
     favicon: str = "favicon.ico"
     keywords:str=""
     description:str=""
@@ -83,70 +221,238 @@ def zip_folder_respecting_gitignore(folder_path: str, zip_path_: str, options: Z
     """
     Zips the contents of a folder while excluding gitignore and .git
     """
+    if options.fast_deflate and isal_zlib is None:
+        # parse_args already rejects this; callers building ZipOptions themselves would
+        # otherwise only find out from an AttributeError inside a worker
+        raise RuntimeError("fast_deflate needs isal installed (pip install isal)")
     folder = Path(folder_path).resolve()
     zip_path = Path(zip_path_).resolve()
 
-    ignore_spec = load_gitignore_patterns(folder)
-
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for path in folder.rglob("*"):
-            relative_path = path.relative_to(folder)
-
-            if (
-                path.is_file()
-                and not ignore_spec.match_file(os.fspath(relative_path))
-
-                and ".git" not in relative_path.parts
-            ):
-                # print("Writing ", str(relative_path))
-                # print(relative_path.parts)
-                print(f"Inserting {path}")
-                if options.remove_builtin_libs and relative_path.parts[0] == "lib":
-                    pass
-                    # print(f"Skipping adding the lib", relative_path)
-                elif options.ogg_compression_level is not None and path.suffix == ".ogg":
-                    # print("Compressing", path)
-                    with open(path, "rb") as ab:
-                        audio_bytes = ab.read()
-                        compressed = compress_ogg_file(audio_bytes, options.ogg_compression_level)
-                        zipf.writestr(os.fspath(relative_path), compressed)
-                elif options.remove_borders and is_border_file(relative_path.parts):
-                    # print("Skipping adding the border", relative_path)
-                    # don't add this one
-                    pass
-                elif path.suffix == ".wav":
-                    # print("Compressing ", path)
-                    ogg_contents = wav_to_ogg(path, options.ogg_compression_level if options.also_compress_converted_ogg else None)
-                    relative_path_2 = relative_path.with_suffix(".ogg")
-                    zipf.writestr(os.fspath(relative_path_2), ogg_contents)
-                else:
-                    zipf.write(path, arcname=os.fspath(relative_path))
-
-
-
-def is_border_file(iterable: Sequence[str]) -> bool:
-    return any(a == "assets" and b == "sprites" and c == "borders" for a, b, c in zip(iterable, iterable[1:], iterable[2:]))
-
-def compress_ogg_file(ogg_contents: bytes, compression_level: int) -> bytes:
-    from pydub import AudioSegment
-    audio_bytes_io = io.BytesIO(ogg_contents)
-    audio = AudioSegment.from_ogg(audio_bytes_io)
-    ogg_buffer = io.BytesIO()
-    audio.export(ogg_buffer, 
-                 format="ogg",
-                 codec="libvorbis", 
-                 parameters=["-q:a", str(compression_level)])
-    return ogg_buffer.getvalue()
-
-def wav_to_ogg(wav_path: Path, compression_level: Optional[int]) -> bytes:
-    from pydub import AudioSegment
-    audio = AudioSegment.from_wav(os.fspath(wav_path))
-    ogg_buffer = io.BytesIO()
-    if compression_level is None:
-        audio.export(ogg_buffer, format="ogg")
+    ignore_rules = IgnoreRules(os.fspath(folder))
+
+    # hoisted out of the per-file loop
+    skip_lib = options.remove_builtin_libs
+    skip_borders = options.remove_borders
+    # suffix -> (ffmpeg input format, -q:a level) for files that get transcoded to ogg
+    transcode_by_suffix: Dict[str, Tuple[str, Optional[int]]] = {}
+    if options.ogg_compression_level is not None:
+        transcode_by_suffix[".ogg"] = ("ogg", options.ogg_compression_level)
+    if options.wav_to_ogg:
+        transcode_by_suffix[".wav"] = ("wav", options.ogg_compression_level if options.also_compress_converted_ogg else None)
+
+    # audio conversion is farmed out to worker processes; only the main
+    # thread ever touches zipf since ZipFile is not thread-safe
+    workers = os.cpu_count() or 1
+    if platform.system() == 'Windows':
+        # ProcessPoolExecutor raises ValueError for more than 61 workers on Windows
+        workers = min(workers, 61)
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        transcode_jobs: List[TranscodeJob] = []
+        transcode_infos: List[zipfile.ZipInfo] = []
+        pending: Dict[Future[List[bytes]], List[zipfile.ZipInfo]] = {}
+        pending_deflate: Dict[Future[Tuple[bytes, int, int]], zipfile.ZipInfo] = {}
+        # every future from both dicts, in the order it was submitted
+        submitted: Deque[Future] = deque()
+
+        def submit_transcodes(batch_size: int) -> None:
+            # audio goes out in batches so each ffmpeg process handles many files
+            for i in range(0, len(transcode_jobs), batch_size):
+                future = executor.submit(transcode_files_to_ogg, transcode_jobs[i:i + batch_size])
+                pending[future] = transcode_infos[i:i + batch_size]
+                submitted.append(future)
+            transcode_jobs.clear()
+            transcode_infos.clear()
+
+        for rel_str, entry in walk_files(os.fspath(folder), ignore_rules):
+            # print("Writing ", rel_str)
+            print(f"Inserting {entry.path}")
+            suffix = os.path.splitext(entry.name)[1].lower()
+            transcode = transcode_by_suffix.get(suffix)
+            if skip_lib and rel_str.partition("/")[0] == "lib":
+                pass
+                # print(f"Skipping adding the lib", rel_str)
+            elif skip_borders and is_border_file(rel_str):
+                # print("Skipping adding the border", rel_str)
+                # don't add this one
+                pass
+            elif transcode is not None:
+                # print("Compressing", entry.path)
+                input_fmt, level = transcode
+                # the worker reads the file itself rather than having the bytes pickled over
+                transcode_jobs.append((entry.path, level, input_fmt))
+                zinfo = zipfile.ZipInfo.from_file(entry.path, arcname=rel_str[:-len(suffix)] + ".ogg")
+                # transcoder output is always ogg
+                zinfo.compress_type = zipfile.ZIP_STORED
+                transcode_infos.append(zinfo)
+                # ffmpeg transcodes a batch on one core, so batches only go out early once
+                # there are enough jobs to hand every worker a full one
+                if len(transcode_jobs) == workers * TRANSCODE_BATCH_SIZE:
+                    submit_transcodes(TRANSCODE_BATCH_SIZE)
+            elif suffix in INCOMPRESSIBLE:
+                # from_file stats once and fills in file_size, which also lets
+                # zipf.open decide on zip64 without needing force_zip64
+                zinfo = zipfile.ZipInfo.from_file(entry.path, arcname=rel_str)
+                zinfo.compress_type = zipfile.ZIP_STORED
+                with open(entry.path, "rb") as src, zipf.open(zinfo, "w") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            else:
+                # every zip entry is its own deflate stream, so they can be compressed in parallel
+                zinfo = zipfile.ZipInfo.from_file(entry.path, arcname=rel_str)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                future = executor.submit(deflate_file, entry.path, options.fast_deflate)
+                pending_deflate[future] = zinfo
+                submitted.append(future)
+
+        ignore_rules.save()
+
+        # the rest is spread evenly over the workers, at most TRANSCODE_BATCH_SIZE per batch
+        submit_transcodes(min(TRANSCODE_BATCH_SIZE, max(1, -(-len(transcode_jobs) // workers))))
+
+        # written in submission order rather than completion order, so the same tree always
+        # gives the same archive bytes; popped so each payload can be freed once it's written
+        while submitted:
+            future = submitted.popleft()
+            if future in pending:
+                # fill in the header ourselves so the CRC is one zlib.crc32 call over the
+                # whole buffer, rather than writestr's trip through a _ZipWriteFile
+                for zinfo, ogg_contents in zip(pending.pop(future), future.result()):
+                    zinfo.CRC = zlib.crc32(ogg_contents)
+                    zinfo.file_size = len(ogg_contents)
+                    write_precompressed(zipf, zinfo, ogg_contents)
+            else:
+                zinfo = pending_deflate.pop(future)
+                compressed, zinfo.CRC, zinfo.file_size = future.result()
+                write_precompressed(zipf, zinfo, compressed)
+
+
+def read_file(file_path: str) -> bytes:
+    """
+    Reads a whole file with one read() on a raw fd, without building the
+    FileIO/BufferedReader pair that open() does
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        # a single read() can come back short, e.g. past 2 GiB on Linux
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+    finally:
+        os.close(fd)
+
+
+def deflate_file(file_path: str, fast_deflate: bool) -> Tuple[bytes, int, int]:
+    """
+    Raw deflates a file the way zipfile would for a ZIP_DEFLATED entry.
+    Returns (compressed bytes, crc32, uncompressed size)
+    """
+    data = read_file(file_path)
+    if fast_deflate:
+        compressor = isal_zlib.compressobj(isal_zlib.ISAL_BEST_COMPRESSION, isal_zlib.DEFLATED, -15)
     else:
-        audio.export(ogg_buffer, format="ogg", codec="libvorbis", parameters=["-q:a", str(compression_level)])
-    return ogg_buffer.getvalue()
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+
+def write_precompressed(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, payload: bytes) -> None:
+    """
+    Appends an entry whose payload has already been compressed.
+    zinfo must have compress_type, CRC and file_size set.
+    ZipFile has no public API for this, so it writes the local header itself
+    and does the same bookkeeping ZipFile.write does
+    """
+    zinfo.compress_size = len(payload)
+    zipf._writecheck(zinfo)
+    zipf._didModify = True
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(payload)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+
+
+
+def walk_files(root: str, ignore_rules: IgnoreRules) -> Iterator[Tuple[str, "os.DirEntry[str]"]]:
+    """
+    Yields (posix path relative to root, DirEntry) for every file under root that isn't ignored.
+    Works straight off os.scandir so each DirEntry's cached type is used instead of a stat per file,
+    and prunes .git and ignored directories before descending into them.
+    Each directory's .gitignore is loaded into ignore_rules before its entries are matched,
+    so no separate pass is needed to find them.
+    Like os.walk, symlinked directories aren't followed
+    """
+    stack = [(root, "")]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue  # os.walk skips unreadable directories too
+        for entry in entries:
+            if entry.name == ".gitignore" and entry.is_file():
+                ignore_rules.add_gitignore(rel_prefix, entry)
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            rel_str = rel_prefix + entry.name
+            if entry.is_dir():
+                if not entry.is_symlink() and not ignore_rules.match_file(f"{rel_str}/"):
+                    stack.append((entry.path, f"{rel_str}/"))
+            elif entry.is_file() and not ignore_rules.match_file(rel_str):
+                yield rel_str, entry
+
+
+def is_border_file(relative_path: str) -> bool:
+    # a single substring search over the posix relative path;
+    # the slashes on both ends keep it from matching partial part names
+    return "/assets/sprites/borders/" in f"/{relative_path}/"
+
+def transcode_files_to_ogg(jobs: List[TranscodeJob]) -> List[bytes]:
+    """
+    Converts each job's source file to OGG (libvorbis), returned in the same order as jobs.
+    A job's level is the -q:a quality; None uses the encoder default.
+    The whole batch goes through one ffmpeg process, one input and one mapped output per job,
+    so process startup and codec init are paid once per batch instead of once per file.
+    A batch whose command line would exceed MAX_COMMAND_LINE is split over several processes
+    """
+    with tempfile.TemporaryDirectory() as out_dir:
+        out_paths = [os.path.join(out_dir, f"{i}.ogg") for i in range(len(jobs))]
+        start = 0
+        for end in range(2, len(jobs) + 1):
+            if len(subprocess.list2cmdline(ffmpeg_argv(jobs[start:end], out_paths[start:end]))) > MAX_COMMAND_LINE:
+                run_ffmpeg(ffmpeg_argv(jobs[start:end - 1], out_paths[start:end - 1]), end - 1 - start)
+                start = end - 1
+        run_ffmpeg(ffmpeg_argv(jobs[start:], out_paths[start:]), len(jobs) - start)
+        return [read_file(out_path) for out_path in out_paths]
+
+def ffmpeg_argv(jobs: List[TranscodeJob], out_paths: List[str]) -> List[str]:
+    argv = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    for src, _, input_fmt in jobs:
+        argv += ["-f", input_fmt, "-i", src]
+    for i, ((_, level, _), out_path) in enumerate(zip(jobs, out_paths)):
+        argv += ["-map", f"{i}:a:0", "-c:a", "libvorbis"]
+        if level is not None:
+            argv += ["-q:a", str(level)]
+        # without bitexact the ogg muxer picks a random stream serial on every run
+        argv += ["-fflags", "+bitexact", "-f", "ogg", out_path]
+    return argv
+
+def run_ffmpeg(argv: List[str], file_count: int) -> None:
+    try:
+        subprocess.run(argv, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        # ffmpeg's stderr is what names the file that broke
+        raise RuntimeError(
+            f"ffmpeg exited with status {e.returncode} while transcoding {file_count} file(s):\n"
+            + e.stderr.decode(errors="replace")
+        ) from e
 
 def parse_args() -> ZipOptions:
     import argparse
@@ -160,6 +466,7 @@ def parse_args() -> ZipOptions:
     parser.add_argument('--keywords'   , type=str, default='', help="Add this as a meta tag to the HTML")
     parser.add_argument('--description', type=str, default='', help="Add this as a meta tag to the HTML")
     parser.add_argument('--author'     , type=str, default='', help="Add this as a meta tag to the HTML")
+    parser.add_argument('--fast-deflate', action="store_true", help="Deflate with isal (pip install isal) instead of zlib; faster, but the .love comes out larger")
 
     args = parser.parse_args()
     keywords   :str = args.keywords
@@ -171,6 +478,9 @@ def parse_args() -> ZipOptions:
     base_href: str = args.base_href
     compress: bool = args.compress
     favicon = args.favicon or "favicon.ico"
+    fast_deflate: bool = args.fast_deflate
+    if fast_deflate and isal_zlib is None:
+        parser.error("--fast-deflate needs isal installed (pip install isal)")
 
     options_obj = ZipOptions(
         kristal_folder=kristal_folder,html_folder_output=html_folder_output,
@@ -180,6 +490,7 @@ def parse_args() -> ZipOptions:
         keywords   =keywords   ,
         description=description,
         author     =author     ,
+        fast_deflate=fast_deflate,
     ) if compress else ZipOptions(
         kristal_folder=kristal_folder,html_folder_output=html_folder_output,
         game_name=game_name,
@@ -194,37 +505,46 @@ def parse_args() -> ZipOptions:
         keywords   =keywords   ,
         description=description,
         author     =author     ,
+        fast_deflate=fast_deflate,
     )
     return options_obj
 
 
-def recipe() -> None:
-    
-    kristal_output = f"kristal_temp_written_{int(time.time())}.love"
-    options = parse_args()
-    print("Zipping stuff...")
-    zip_folder_respecting_gitignore(os.fspath(options.kristal_folder), kristal_output,
-                                    options)
+def love_js_command(options: ZipOptions, love_file: str) -> List[str]:
     # npx love.js.cmd kristal.love kristal_rel -c -m 1500000000 -t kristal
-    
     npx_command = shutil.which("npx")
     if not npx_command:
         raise RuntimeError("npx cannot run. is node installed and in your path?")
-    print("Creating ")
     compatibility_mode = True
 
     love_js_command = 'love.js.cmd'
     if platform.system() == 'Linux' or platform.system() == 'Darwin':
         love_js_command = 'love.js'
 
-    sub_cmd = [npx_command, love_js_command, kristal_output, options.html_folder_output,
+    sub_cmd = [npx_command, love_js_command, love_file, options.html_folder_output,
                '-c' if compatibility_mode else None,
                 '-m', str(options.memory) if options.memory else '700000000',
                 '-t', (options.game_name or 'kristal')
                ]
+    return [t for t in sub_cmd if t is not None]
+
+
+def recipe() -> None:
     
-    subprocess.run([t for t in sub_cmd if t is not None])
-    modify_output(options)
+    options = parse_args()
+    # love.js only reads the game from a path, so the archive still has to hit disk;
+    # the system temp dir is often tmpfs, and the file no longer lingers in the cwd
+    with tempfile.NamedTemporaryFile(suffix=".love", delete=False) as tmp:
+        kristal_output = tmp.name
+    try:
+        print("Zipping stuff...")
+        zip_folder_respecting_gitignore(os.fspath(options.kristal_folder), kristal_output,
+                                        options)
+        print("Creating ")
+        subprocess.run(love_js_command(options, kristal_output))
+        modify_output(options)
+    finally:
+        Path(kristal_output).unlink(missing_ok=True)
     
 
 def modify_output(options: ZipOptions) -> None:
@@ -255,30 +575,20 @@ def modify_output(options: ZipOptions) -> None:
     ]
     template_res = "    \n".join(liners) + "\nfunction goFullScreen()"
     new_index = index_html_file.read_text(encoding="UTF-8").replace(template_rep, template_res)
-    # if options.base_href:
-        # new_index = new_index.replace("<head>", f"<head> <base href=\"{options.base_href}\">")
-    
-    soup = BeautifulSoup(new_index, "html.parser")
-    head_tag = soup.find('head')
-    if head_tag and isinstance(head_tag, Tag):
-        if options.base_href:
-            base_tag = soup.new_tag('base', href=options.base_href)
-            head_tag.insert(0, base_tag)
-        icon_tag = soup.new_tag("link", rel="icon", href="favicon.ico", type="image/x-icon")
-        head_tag.insert(0, icon_tag)
-        new_tags: list[Tag] = []
-        if options.keywords:
-            head_tag.insert(0, soup.new_tag('meta', attrs={"name": "keywords", "content": options.keywords}))
-        if options.author:
-            head_tag.insert(0, soup.new_tag('meta', attrs={"name": "author", "content": options.author}))
-        if options.description:
-            head_tag.insert(0, soup.new_tag('meta', attrs={"name": "description", "content": options.description}))
-
-    for h1 in soup.find_all("h1"):
-        h1.decompose()
-    for footer in soup.find_all("footer"):
-        footer.decompose()
-    new_index = soup.prettify(formatter="html")
+
+    # same order BeautifulSoup used to produce when inserting each tag at index 0
+    head_tags: List[str] = []
+    if options.description:
+        head_tags.append(f'<meta name="description" content="{escape(options.description)}">')
+    if options.author:
+        head_tags.append(f'<meta name="author" content="{escape(options.author)}">')
+    if options.keywords:
+        head_tags.append(f'<meta name="keywords" content="{escape(options.keywords)}">')
+    head_tags.append('<link rel="icon" href="favicon.ico" type="image/x-icon">')
+    if options.base_href:
+        head_tags.append(f'<base href="{escape(options.base_href)}">')
+    new_index = HEAD_OPEN_RE.sub(lambda m: m.group(0) + "".join(head_tags), new_index, count=1)
+    new_index = H1_FOOTER_RE.sub("", new_index)
     index_html_file.write_text(new_index, encoding="UTF-8")
 
     tr_res_extras = """